@@ -1,12 +1,15 @@
 import time
-import requests
 from django.contrib import admin, messages
+from django.db import transaction
 from django.http import HttpResponseRedirect
 from django.urls import path, reverse
 from django.utils.html import format_html
 from django.utils.timezone import now
 
-from .models import Product, Order, OrderItem, Payment
+from .models import (
+    Product, Order, OrderItem, Payment, ArchivedOrder, WebhookEndpoint, PendingWebhookEvent, WebhookDelivery,
+)
+from .webhooks import dispatcher
 
 
 class OrderItemInline(admin.TabularInline):
@@ -59,27 +62,29 @@ class OrderAdmin(admin.ModelAdmin):
 
     def confirm_order(self, request, object_id, *args, **kwargs):
         """
-        Обрабатывает подтверждение заказа, изменяет его статус и отправляет POST-запрос на внешний сервис.
+        Обрабатывает подтверждение заказа, изменяет его статус и ставит вебхук в очередь на отправку.
         """
         order = Order.objects.get(pk=object_id)
         if not order.payments.filter(status="Оплачен").exists():
             self.message_user(request, 'Заказ не может быть подтвержден без оплаченного платежа.', messages.ERROR)
             return HttpResponseRedirect('.')
 
-        order.status = 'confirmed'
-        order.confirmation_time = now()
-        order.save()
-
         # Симуляция подготовки заказа
         time.sleep(2)
 
-        # Отправка POST-запроса
-        data = {
-            "id": order.id,
-            "amount": str(order.total_sum),
-            "date": order.confirmation_time.isoformat()
-        }
-        requests.post('https://webhook.site/36693e00-8f59-4f7b-9a85-1d1e7ddde4d4', json=data)
+        # Подтверждение и постановка вебхука в очередь в одной транзакции,
+        # чтобы подтвержденный заказ не остался без уведомления.
+        with transaction.atomic():
+            order.status = 'confirmed'
+            order.confirmation_time = now()
+            order.save()
+
+            data = {
+                "id": order.id,
+                "amount": str(order.total_sum),
+                "date": order.confirmation_time.isoformat()
+            }
+            dispatcher.send(data)
 
         self.message_user(request, 'Заказ подтвержден.', messages.SUCCESS)
         return HttpResponseRedirect(reverse('admin:app_order_changelist'))
@@ -108,3 +113,49 @@ class PaymentAdmin(admin.ModelAdmin):
         return obj.amount
 
     display_amount.short_description = "Сумма"
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    """
+    Административный класс для модели ArchivedOrder.
+    """
+    list_display = ['id', 'status', 'creation_time', 'confirmation_time', 'total_sum', 'archived_at']
+    date_hierarchy = 'creation_time'
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    """
+    Административный класс для модели WebhookEndpoint.
+    """
+    list_display = ['url', 'batch_size', 'batch_interval_ms', 'use_gzip', 'max_attempts', 'legacy_payload', 'is_active']
+
+
+@admin.register(PendingWebhookEvent)
+class PendingWebhookEventAdmin(admin.ModelAdmin):
+    """
+    Административный класс для модели PendingWebhookEvent.
+    """
+    list_display = ['id', 'endpoint', 'created_at']
+    list_filter = ['endpoint']
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    """
+    Административный класс для модели WebhookDelivery.
+    """
+    list_display = ['id', 'endpoint', 'created_at', 'attempt', 'events_count', 'status_code', 'latency_ms', 'gave_up']
+    list_filter = ['endpoint', 'status_code', 'gave_up']
+    actions = ['redeliver']
+
+    @admin.action(description='Повторить доставку')
+    def redeliver(self, request, queryset):
+        """
+        Возвращает в очередь события из выбранных записей, по которым доставка была прекращена.
+        """
+        deliveries = queryset.filter(gave_up=True, events__isnull=False)
+        for delivery in deliveries:
+            dispatcher.redeliver(delivery)
+        self.message_user(request, f'Возвращено в очередь: {len(deliveries)}.', messages.SUCCESS)
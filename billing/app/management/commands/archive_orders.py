@@ -0,0 +1,95 @@
+import csv
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import Order, ArchivedOrder
+
+CSV_FIELDS = ['id', 'status', 'creation_time', 'confirmation_time', 'total_sum', 'items', 'payments', 'archived_at']
+
+
+class Command(BaseCommand):
+    """
+    Переносит закрытые заказы старше срока хранения из рабочих таблиц в архив.
+
+    Заказ вместе с позициями и платежами сворачивается в одну строку таблицы
+    ArchivedOrder или CSV-файла и удаляется из app_order, app_orderitem и
+    app_payment. Перенос идет пачками, каждая пачка — в отдельной транзакции.
+    Строки CSV пишутся до удаления заказов, поэтому при сбое удаления заказ
+    остается в таблицах, а повторный запуск пропускает уже записанные id.
+
+    Перенесенные заказы больше не видны в запросах через Order.objects,
+    в списке заказов админки и в итоговых суммах. Найти заказ по id с учетом
+    архивной таблицы можно через Order.objects.get_or_archived(pk); заказы,
+    выгруженные в CSV, доступны только в файле.
+    """
+    help = 'Переносит закрытые заказы старше срока хранения в архив.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.ORDER_RETENTION_DAYS,
+                            help='Срок хранения заказов в рабочих таблицах, дней.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Число заказов в одной транзакции.')
+        parser.add_argument('--csv', dest='csv_path', help='Записать архив в CSV-файл вместо таблицы ArchivedOrder.')
+        parser.add_argument('--dry-run', action='store_true', help='Только посчитать заказы для архивации.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        queryset = Order.objects.filter(status__in=Order.CLOSED_STATUSES, creation_time__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f'Заказов для архивации: {queryset.count()}')
+            return
+
+        archived_ids = self.read_archived_ids(options['csv_path']) if options['csv_path'] else set()
+        csv_file = open(options['csv_path'], 'a', newline='') if options['csv_path'] else None
+        try:
+            writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS) if csv_file else None
+            if writer and csv_file.tell() == 0:
+                writer.writeheader()
+            archived = 0
+            while True:
+                with transaction.atomic():
+                    orders = list(
+                        queryset.order_by('id')
+                        .prefetch_related('items__product', 'payments')[:options['batch_size']]
+                    )
+                    if not orders:
+                        break
+                    rows = [ArchivedOrder.from_order(order) for order in orders]
+                    if writer:
+                        # Заказы, записанные в файл прошлым запуском, у которого не удалось удаление, не дублируем.
+                        new_rows = [row for row in rows if row.id not in archived_ids]
+                        writer.writerows(self.to_csv_row(row) for row in new_rows)
+                        csv_file.flush()
+                        archived_ids.update(row.id for row in new_rows)
+                    else:
+                        ArchivedOrder.objects.bulk_create(rows)
+                    Order.objects.filter(id__in=[order.id for order in orders]).delete()
+                archived += len(orders)
+        finally:
+            if csv_file:
+                csv_file.close()
+
+        self.stdout.write(self.style.SUCCESS(f'Заархивировано заказов: {archived}'))
+
+    @staticmethod
+    def read_archived_ids(path):
+        """
+        Возвращает id заказов, уже записанных в CSV-файл архива.
+        """
+        try:
+            with open(path, newline='') as csv_file:
+                return {int(row['id']) for row in csv.DictReader(csv_file)}
+        except FileNotFoundError:
+            return set()
+
+    @staticmethod
+    def to_csv_row(archived_order):
+        row = {field: getattr(archived_order, field) for field in CSV_FIELDS}
+        row['items'] = json.dumps(row['items'])
+        row['payments'] = json.dumps(row['payments'])
+        return row
@@ -0,0 +1,100 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+COLD_START_SCRIPT = '''
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.perf_counter()
+
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': 'localhost'}
+setup_testing_defaults(environ)
+result = {}
+b''.join(application(environ, lambda status, headers: result.update(status=status)))
+done = time.perf_counter()
+
+print(json.dumps({
+    'setup_ms': (ready - started) * 1000,
+    'first_request_ms': (done - ready) * 1000,
+    'status': result['status'],
+}))
+'''
+
+
+class Command(BaseCommand):
+    """
+    Измеряет время импорта и холодного старта для профилей настроек.
+
+    Каждый замер выполняется в отдельном процессе: время импорта считается
+    по выводу `python -X importtime`, холодный старт включает инициализацию
+    WSGI-приложения и первый запрос к указанному URL. Выводятся медианы
+    по `--runs` запускам; если первый запрос вернул не 2xx, команда
+    завершается с ошибкой.
+    """
+    help = 'Измеряет время импорта и холодного старта для профилей настроек.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-modules', nargs='+',
+            default=['billing.settings', 'billing.settings_api', 'billing.settings_worker'],
+            help='Модули настроек для сравнения.',
+        )
+        parser.add_argument('--url', default='/products/', help='URL первого запроса.')
+        parser.add_argument('--runs', type=int, default=5, help='Число запусков на профиль.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'profile':<28}{'modules':>9}{'import ms':>12}{'setup ms':>11}{'1st req ms':>12}  status")
+        failed = []
+        for module in options['settings_modules']:
+            imports = [self.measure_import_time(module, options['url']) for _ in range(options['runs'])]
+            runs = [self.measure_cold_start(module, options['url']) for _ in range(options['runs'])]
+            modules = imports[-1][0]
+            import_ms = statistics.median(import_time for _, import_time in imports)
+            setup_ms = statistics.median(run['setup_ms'] for run in runs)
+            request_ms = statistics.median(run['first_request_ms'] for run in runs)
+            statuses = {run['status'] for run in runs}
+            self.stdout.write(
+                f"{module:<28}{modules:>9}{import_ms:>12.1f}{setup_ms:>11.1f}{request_ms:>12.1f}  {', '.join(statuses)}"
+            )
+            if any(not status.startswith('2') for status in statuses):
+                failed.append(module)
+
+        if failed:
+            raise CommandError(
+                f"Первый запрос к {options['url']} вернул не 2xx для профилей: {', '.join(failed)}. "
+                f"Время первого запроса для них не показательно (примените миграции или укажите --url)."
+            )
+
+    def run_script(self, module, url, *python_args):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': module}
+        return subprocess.run(
+            [sys.executable, *python_args, '-c', COLD_START_SCRIPT, url],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+
+    def measure_import_time(self, module, url):
+        """
+        Возвращает число импортированных модулей и суммарное время их импорта в мс.
+        """
+        stderr = self.run_script(module, url, '-X', 'importtime').stderr
+        self_times = [
+            int(line.split(':', 1)[1].split('|')[0])
+            for line in stderr.splitlines()
+            if line.startswith('import time:') and line.split(':', 1)[1].split('|')[0].strip().isdigit()
+        ]
+        return len(self_times), sum(self_times) / 1000
+
+    def measure_cold_start(self, module, url):
+        """
+        Возвращает время инициализации приложения и первого запроса в новом процессе.
+        """
+        return json.loads(self.run_script(module, url).stdout.strip().splitlines()[-1])
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from app.webhooks import dispatcher
+
+
+class Command(BaseCommand):
+    """
+    Отправляет вебхуки из очереди PendingWebhookEvent.
+
+    По умолчанию работает постоянно, опрашивая очередь каждые
+    WEBHOOK_POLL_INTERVAL секунд. Можно запускать несколько экземпляров:
+    на PostgreSQL строки очереди блокируются через SELECT ... SKIP LOCKED.
+    """
+    help = 'Отправляет вебхуки из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Выполнить один проход по очереди и завершиться.')
+        parser.add_argument('--flush', action='store_true',
+                            help='Отправлять неполные пакеты, не дожидаясь batch_interval_ms.')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = dispatcher.process(flush=options['flush'])
+            if processed:
+                self.stdout.write(f'Обработано событий: {processed}')
+            if options['once']:
+                return
+            close_old_connections()
+            time.sleep(settings.WEBHOOK_POLL_INTERVAL)
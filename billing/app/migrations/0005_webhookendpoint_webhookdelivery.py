@@ -0,0 +1,61 @@
+# Generated by Django 5.0.3 on 2026-10-19 12:15
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_default_endpoint(apps, schema_editor):
+    # Сохраняем ранее захардкоженного получателя подтверждений заказов.
+    WebhookEndpoint = apps.get_model('app', 'WebhookEndpoint')
+    WebhookEndpoint.objects.create(url='https://webhook.site/36693e00-8f59-4f7b-9a85-1d1e7ddde4d4')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_alter_payment_amount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, verbose_name='URL')),
+                ('secret', models.CharField(blank=True, max_length=255, verbose_name='Секрет для HMAC-подписи')),
+                ('batch_size', models.PositiveIntegerField(default=1, verbose_name='Событий в пакете')),
+                ('batch_interval_ms', models.PositiveIntegerField(default=1000, verbose_name='Интервал отправки пакета, мс')),
+                ('use_gzip', models.BooleanField(default=False, verbose_name='Сжимать тело gzip')),
+                ('max_attempts', models.PositiveIntegerField(default=1, verbose_name='Число попыток доставки')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активен')),
+            ],
+            options={
+                'verbose_name': 'Получатель вебхуков',
+                'verbose_name_plural': 'Получатели вебхуков',
+            },
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='products/', verbose_name='Картинка'),
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время попытки')),
+                ('attempt', models.PositiveIntegerField(default=1, verbose_name='Попытка')),
+                ('events_count', models.PositiveIntegerField(verbose_name='Событий в пакете')),
+                ('status_code', models.PositiveIntegerField(blank=True, null=True, verbose_name='HTTP-статус')),
+                ('latency_ms', models.FloatField(verbose_name='Задержка, мс')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='app.webhookendpoint', verbose_name='Получатель')),
+            ],
+            options={
+                'verbose_name': 'Доставка вебхука',
+                'verbose_name_plural': 'Доставки вебхуков',
+            },
+        ),
+        migrations.RunPython(create_default_endpoint, migrations.RunPython.noop),
+    ]
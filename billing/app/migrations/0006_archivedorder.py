@@ -0,0 +1,36 @@
+# Generated by Django 5.0.3 on 2026-10-19 12:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_webhookendpoint_webhookdelivery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID заказа')),
+                ('status', models.CharField(choices=[('created', 'Создан'), ('confirmed', 'Подтвержден'), ('completed', 'Завершен')], max_length=10, verbose_name='Статус')),
+                ('creation_time', models.DateTimeField(db_index=True, verbose_name='Время создания')),
+                ('confirmation_time', models.DateTimeField(blank=True, null=True, verbose_name='Время подтверждения')),
+                ('total_sum', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Итоговая сумма')),
+                ('items', models.JSONField(default=list, verbose_name='Позиции')),
+                ('payments', models.JSONField(default=list, verbose_name='Платежи')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время архивации')),
+            ],
+            options={
+                'verbose_name': 'Архивный заказ',
+                'verbose_name_plural': 'Архивные заказы',
+            },
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='creation_time',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Время создания'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.3 on 2026-10-19 12:23
+
+from django.db import migrations, models
+
+
+def keep_legacy_payload_for_default_endpoint(apps, schema_editor):
+    # Получатель из 0005 ожидает событие без конверта, как до пакетной доставки.
+    WebhookEndpoint = apps.get_model('app', 'WebhookEndpoint')
+    WebhookEndpoint.objects.filter(
+        url='https://webhook.site/36693e00-8f59-4f7b-9a85-1d1e7ddde4d4',
+    ).update(legacy_payload=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_archivedorder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhookdelivery',
+            name='events',
+            field=models.JSONField(blank=True, null=True, verbose_name='Недоставленные события'),
+        ),
+        migrations.AddField(
+            model_name='webhookdelivery',
+            name='gave_up',
+            field=models.BooleanField(default=False, verbose_name='Доставка прекращена'),
+        ),
+        migrations.AddField(
+            model_name='webhookendpoint',
+            name='legacy_payload',
+            field=models.BooleanField(default=False, help_text='Отправлять каждое событие отдельным запросом без конверта {"events": [...]}.', verbose_name='Старый формат'),
+        ),
+        migrations.RunPython(keep_legacy_payload_for_default_endpoint, migrations.RunPython.noop),
+    ]
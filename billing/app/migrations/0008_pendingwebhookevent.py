@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-19 12:29
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_webhook_legacy_payload_gave_up'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.JSONField(verbose_name='Событие')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время постановки в очередь')),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_events', to='app.webhookendpoint', verbose_name='Получатель')),
+            ],
+            options={
+                'verbose_name': 'Вебхук в очереди',
+                'verbose_name_plural': 'Вебхуки в очереди',
+            },
+        ),
+    ]
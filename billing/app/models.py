@@ -16,6 +16,29 @@ class Product(models.Model):
         return self.name
 
 
+class OrderManager(models.Manager):
+    """
+    Менеджер заказов с поиском по id с учетом архива.
+    """
+
+    def get_or_archived(self, pk):
+        """
+        Возвращает заказ по id, а если он перенесен командой archive_orders — запись ArchivedOrder.
+
+        У архивной записи те же поля status, creation_time, confirmation_time
+        и total_sum, поэтому код, который только читает заказ, работает с ней
+        без изменений. Заказы, выгруженные в CSV, здесь не находятся.
+        Обычные запросы через Order.objects архивные заказы не возвращают.
+        """
+        try:
+            return self.get(pk=pk)
+        except self.model.DoesNotExist:
+            try:
+                return ArchivedOrder.objects.get(pk=pk)
+            except ArchivedOrder.DoesNotExist:
+                raise self.model.DoesNotExist(f'Order {pk} not found in orders or archive.') from None
+
+
 class Order(models.Model):
     """
     Модель заказа, отражающая информацию о заказах пользователей.
@@ -25,10 +48,13 @@ class Order(models.Model):
         ('confirmed', 'Подтвержден'),
         ('completed', 'Завершен'),
     )
+    CLOSED_STATUSES = ('confirmed', 'completed')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='created', verbose_name="Статус")
-    creation_time = models.DateTimeField(default=timezone.now, verbose_name="Время создания")
+    creation_time = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Время создания")
     confirmation_time = models.DateTimeField(null=True, blank=True, verbose_name="Время подтверждения")
 
+    objects = OrderManager()
+
     def __str__(self):
         """Возвращает идентификатор и статус заказа."""
         return f"Order {self.id} - {self.status}"
@@ -37,8 +63,13 @@ class Order(models.Model):
     def total_sum(self):
         """
         Вычисляет итоговую сумму заказа на основе стоимости всех товаров в заказе.
+        Стоимость продуктов берется из кеша продуктов, а не через item.product.
         """
-        return sum(item.product.cost * item.quantity for item in self.items.all())
+        from .product_cache import product_cache
+
+        items = list(self.items.all())
+        products = product_cache.get_many({item.product_id for item in items})
+        return sum(products[item.product_id].cost * item.quantity for item in items)
 
 
 class OrderItem(models.Model):
@@ -84,3 +115,131 @@ class Payment(models.Model):
         if not self.amount:
             self.amount = self.order.total_sum
         super().save(*args, **kwargs)
+
+
+class ArchivedOrder(models.Model):
+    """
+    Модель архивного заказа: закрытый заказ вместе с позициями и платежами в одной строке.
+    """
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID заказа")
+    status = models.CharField(max_length=10, choices=Order.STATUS_CHOICES, verbose_name="Статус")
+    creation_time = models.DateTimeField(db_index=True, verbose_name="Время создания")
+    confirmation_time = models.DateTimeField(null=True, blank=True, verbose_name="Время подтверждения")
+    total_sum = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Итоговая сумма")
+    items = models.JSONField(default=list, verbose_name="Позиции")
+    payments = models.JSONField(default=list, verbose_name="Платежи")
+    archived_at = models.DateTimeField(default=timezone.now, verbose_name="Время архивации")
+
+    def __str__(self):
+        """Возвращает идентификатор и статус архивного заказа."""
+        return f"Archived order {self.id} - {self.status}"
+
+    @classmethod
+    def from_order(cls, order):
+        """
+        Создает архивную запись из заказа с предзагруженными позициями, продуктами и платежами.
+        """
+        order_items = order.items.all()
+        items = [
+            {
+                'product_id': item.product_id,
+                'product_name': item.product.name,
+                'cost': str(item.product.cost),
+                'quantity': item.quantity,
+            }
+            for item in order_items
+        ]
+        payments = [
+            {
+                'id': payment.id,
+                'amount': str(payment.amount) if payment.amount is not None else None,
+                'status': payment.status,
+                'payment_type': payment.payment_type,
+            }
+            for payment in order.payments.all()
+        ]
+        return cls(
+            id=order.id,
+            status=order.status,
+            creation_time=order.creation_time,
+            confirmation_time=order.confirmation_time,
+            # Сумма считается по тем же предзагруженным продуктам, что и позиции, а не через кеш продуктов.
+            total_sum=sum(item.product.cost * item.quantity for item in order_items),
+            items=items,
+            payments=payments,
+        )
+
+    class Meta:
+        verbose_name = "Архивный заказ"
+        verbose_name_plural = "Архивные заказы"
+
+
+class WebhookEndpoint(models.Model):
+    """
+    Модель получателя вебхуков о подтверждении заказов с настройками пакетной доставки.
+    """
+    url = models.URLField(max_length=500, verbose_name="URL")
+    secret = models.CharField(max_length=255, blank=True, verbose_name="Секрет для HMAC-подписи")
+    batch_size = models.PositiveIntegerField(default=1, verbose_name="Событий в пакете")
+    batch_interval_ms = models.PositiveIntegerField(default=1000, verbose_name="Интервал отправки пакета, мс")
+    use_gzip = models.BooleanField(default=False, verbose_name="Сжимать тело gzip")
+    max_attempts = models.PositiveIntegerField(default=1, verbose_name="Число попыток доставки")
+    legacy_payload = models.BooleanField(
+        default=False, verbose_name="Старый формат",
+        help_text="Отправлять каждое событие отдельным запросом без конверта {\"events\": [...]}.",
+    )
+    is_active = models.BooleanField(default=True, verbose_name="Активен")
+
+    def __str__(self):
+        """Возвращает URL получателя."""
+        return self.url
+
+    class Meta:
+        verbose_name = "Получатель вебхуков"
+        verbose_name_plural = "Получатели вебхуков"
+
+
+class PendingWebhookEvent(models.Model):
+    """
+    Модель очереди исходящих вебхуков: событие, ожидающее отправки получателю.
+    Пакеты собираются из этих строк командой send_webhooks.
+    """
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='pending_events', verbose_name="Получатель")
+    event = models.JSONField(verbose_name="Событие")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Время постановки в очередь")
+
+    def __str__(self):
+        """Возвращает идентификатор события и получателя."""
+        return f"Pending event {self.id} - {self.endpoint_id}"
+
+    class Meta:
+        verbose_name = "Вебхук в очереди"
+        verbose_name_plural = "Вебхуки в очереди"
+
+
+class WebhookDelivery(models.Model):
+    """
+    Модель журнала доставки вебхуков, хранит результат и задержку каждой попытки.
+    """
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='deliveries', verbose_name="Получатель")
+    created_at = models.DateTimeField(default=timezone.now, verbose_name="Время попытки")
+    attempt = models.PositiveIntegerField(default=1, verbose_name="Попытка")
+    events_count = models.PositiveIntegerField(verbose_name="Событий в пакете")
+    status_code = models.PositiveIntegerField(null=True, blank=True, verbose_name="HTTP-статус")
+    latency_ms = models.FloatField(verbose_name="Задержка, мс")
+    error = models.TextField(blank=True, verbose_name="Ошибка")
+    gave_up = models.BooleanField(default=False, verbose_name="Доставка прекращена")
+    events = models.JSONField(null=True, blank=True, verbose_name="Недоставленные события")
+
+    def __str__(self):
+        """Возвращает идентификатор и статус попытки доставки."""
+        return f"Delivery {self.id} - {self.status_code or self.error}"
+
+    @property
+    def is_success(self):
+        """Возвращает True, если получатель ответил кодом 2xx."""
+        return self.status_code is not None and 200 <= self.status_code < 300
+
+    class Meta:
+        verbose_name = "Доставка вебхука"
+        verbose_name_plural = "Доставки вебхуков"
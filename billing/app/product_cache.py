@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Product
+
+ProductInfo = namedtuple('ProductInfo', ['cost', 'name'])
+
+
+class ProductCache:
+    """
+    Ограниченный по размеру LRU-кеш продуктов в памяти процесса: id -> (cost, name).
+
+    Согласованность между процессами обеспечивается ключом версии в кеше Django:
+    при изменении продукта версия меняется, и каждый процесс сбрасывает свой кеш
+    при следующем обращении. Для этого бэкенд кеша должен быть общим для всех
+    процессов (например, Redis); с LocMemCache другие процессы изменение не
+    увидят. Поэтому записи дополнительно живут не дольше `ttl` секунд, что
+    ограничивает время использования устаревшей стоимости при любом бэкенде.
+    Изменения через QuerySet.update() сигналов не отправляют, поэтому после
+    них нужно вызвать invalidate() вручную.
+    """
+    version_key = 'product_cache_version'
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+
+    def get_many(self, product_ids):
+        """
+        Возвращает словарь id -> ProductInfo; недостающие продукты загружаются одним запросом.
+        Несуществующие id в результат не попадают.
+        """
+        version = self._shared_version()
+        result, missing = {}, []
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            now = time.monotonic()
+            for product_id in product_ids:
+                entry = self._entries.get(product_id)
+                if entry is None or entry[1] <= now:
+                    self._entries.pop(product_id, None)
+                    missing.append(product_id)
+                else:
+                    self._entries.move_to_end(product_id)
+                    result[product_id] = entry[0]
+            self.hits += len(result)
+            self.misses += len(missing)
+
+        if missing:
+            loaded = {
+                product_id: ProductInfo(cost, name)
+                for product_id, cost, name in Product.objects.filter(pk__in=missing).values_list('id', 'cost', 'name')
+            }
+            expires_at = time.monotonic() + self.ttl
+            with self._lock:
+                if version == self._version:
+                    self._entries.update((product_id, (info, expires_at)) for product_id, info in loaded.items())
+                    while len(self._entries) > self.maxsize:
+                        self._entries.popitem(last=False)
+            result.update(loaded)
+        return result
+
+    def invalidate(self):
+        """
+        Сбрасывает кеш в текущем процессе и меняет общую версию для остальных процессов.
+        """
+        cache.set(self.version_key, uuid4().hex, timeout=None)
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self):
+        """Возвращает счетчики попаданий и промахов и текущий размер кеша."""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def _shared_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid4().hex, timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+
+product_cache = ProductCache(settings.PRODUCT_CACHE_SIZE, settings.PRODUCT_CACHE_TTL)
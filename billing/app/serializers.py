@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Product, Order, Payment, OrderItem
+from .product_cache import product_cache
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -9,6 +10,9 @@ class ProductSerializer(serializers.ModelSerializer):
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
+    # Существование продукта проверяется пакетно в OrderSerializer.validate_items через кеш продуктов.
+    product = serializers.IntegerField(source='product_id')
+
     class Meta:
         model = OrderItem
         fields = ['product', 'quantity']
@@ -21,11 +25,22 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ['id', 'status', 'creation_time', 'confirmation_time', 'items']
 
+    def validate_items(self, items):
+        products = product_cache.get_many({item['product_id'] for item in items})
+        message = serializers.PrimaryKeyRelatedField.default_error_messages['does_not_exist']
+        errors = [
+            {} if item['product_id'] in products
+            else {'product': [message.format(pk_value=item['product_id'])]}
+            for item in items
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return items
+
     def create(self, validated_data):
         items_data = validated_data.pop('items')
         order = Order.objects.create(**validated_data)
-        for item_data in items_data:
-            OrderItem.objects.create(order=order, **item_data)
+        OrderItem.objects.bulk_create(OrderItem(order=order, **item_data) for item_data in items_data)
         return order
 
 
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Product
+from .product_cache import product_cache
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_cache(sender, **kwargs):
+    """
+    Сбрасывает кеш продуктов при изменении или удалении продукта.
+    Повторный сброс после коммита не дает другим процессам закешировать старые данные.
+    """
+    product_cache.invalidate()
+    transaction.on_commit(product_cache.invalidate)
@@ -1,12 +1,33 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
 from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-from django.contrib.auth.models import User
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
 from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 
-from .models import Product, Order, OrderItem, Payment
+from .models import (
+    Product, Order, OrderItem, Payment, ArchivedOrder, WebhookEndpoint, PendingWebhookEvent, WebhookDelivery,
+)
+from .product_cache import ProductCache, product_cache
+from .throttling import ConcurrencyLimiter, TokenBucketThrottle
+from .views import OrderCreateAPIView
+from .webhooks import SIGNATURE_HEADER, WebhookDispatcher, sign
 from rest_framework.test import APITestCase
 
 
@@ -62,6 +83,85 @@ class ProductAPITests(APITestCase):
         self.assertEqual(response.data[0]['name'], 'Test Product')
 
 
+class ProductCacheTests(APITestCase):
+
+    def setUp(self):
+        self.product1 = Product.objects.create(name='Test Product 1', content='Test Content 1', cost=Decimal('10.00'))
+        self.product2 = Product.objects.create(name='Test Product 2', content='Test Content 2', cost=Decimal('20.00'))
+        self.data = {
+            "items": [
+                {"product": self.product1.id, "quantity": 2},
+                {"product": self.product2.id, "quantity": 1}
+            ]
+        }
+
+    def test_warm_cache_skips_products_table(self):
+        """Тестирование создания заказа без запросов к таблице продуктов при прогретом кеше."""
+        product_cache.get_many([self.product1.id, self.product2.id])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('order-create'), self.data, format='json')
+            total = Order.objects.get(pk=response.data['id']).total_sum
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(total, Decimal('40.00'))
+        self.assertFalse([query for query in queries if 'app_product' in query['sql']])
+
+    def test_unknown_product_is_rejected(self):
+        """Тестирование отказа при создании заказа с несуществующим продуктом."""
+        self.data['items'][1]['product'] = self.product2.id + 100
+        response = self.client.post(reverse('order-create'), self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['items'][0], {})
+        self.assertIn('product', response.data['items'][1])
+        self.assertFalse(Order.objects.exists())
+
+    def test_product_save_invalidates_cache(self):
+        """Тестирование сброса кеша при изменении стоимости продукта."""
+        order = Order.objects.create()
+        OrderItem.objects.create(order=order, product=self.product1, quantity=2)
+        self.assertEqual(order.total_sum, Decimal('20.00'))
+        self.product1.cost = Decimal('15.00')
+        self.product1.save()
+        self.assertEqual(order.total_sum, Decimal('30.00'))
+
+    def test_version_rotated_by_other_process_reloads(self):
+        """Тестирование перезагрузки продуктов после смены версии другим процессом."""
+        self.assertEqual(product_cache.get_many([self.product1.id])[self.product1.id].cost, Decimal('10.00'))
+        # Другой процесс меняет стоимость и версию; сигналы в этом процессе не срабатывают.
+        Product.objects.filter(pk=self.product1.pk).update(cost=Decimal('15.00'))
+        cache.set(product_cache.version_key, 'other-process', timeout=None)
+        self.assertEqual(product_cache.get_many([self.product1.id])[self.product1.id].cost, Decimal('15.00'))
+
+    def test_entries_expire_after_ttl(self):
+        """Тестирование перезагрузки продукта после истечения TTL записи."""
+        lru = ProductCache(maxsize=10, ttl=30)
+        with mock.patch('app.product_cache.time.monotonic', return_value=1000):
+            lru.get_many([self.product1.id])
+        Product.objects.filter(pk=self.product1.pk).update(cost=Decimal('15.00'))
+        with mock.patch('app.product_cache.time.monotonic', return_value=1010):
+            self.assertEqual(lru.get_many([self.product1.id])[self.product1.id].cost, Decimal('10.00'))
+        with mock.patch('app.product_cache.time.monotonic', return_value=1031):
+            self.assertEqual(lru.get_many([self.product1.id])[self.product1.id].cost, Decimal('15.00'))
+        self.assertEqual(lru.stats(), {'hits': 1, 'misses': 2, 'size': 1})
+
+    def test_lru_eviction_and_counters(self):
+        """Тестирование вытеснения давно использованных записей и счетчиков попаданий."""
+        lru = ProductCache(maxsize=1, ttl=60)
+        lru.get_many([self.product1.id])
+        lru.get_many([self.product1.id])
+        lru.get_many([self.product2.id])
+        self.assertEqual(lru.stats(), {'hits': 1, 'misses': 2, 'size': 1})
+        self.assertEqual(lru.get_many([self.product2.id])[self.product2.id].name, 'Test Product 2')
+
+
+class SwaggerTests(APITestCase):
+
+    def test_get_openapi_document(self):
+        """Тестирование получения OpenAPI-документа через лениво созданное представление."""
+        response = self.client.get('/swagger/?format=openapi')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('/orders/', response.json()['paths'])
+
+
 class OrderAndPaymentAPITests(APITestCase):
 
     def setUp(self):
@@ -111,6 +211,312 @@ class OrderAndPaymentAPITests(APITestCase):
         self.assertEqual(payment.amount, order.total_sum)  # Проверяем, что сумма платежа равна сумме заказа
 
 
+class WriteThrottlingTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.order = Order.objects.create(status='created')
+        self.url = reverse('payment-create')
+        self.data = {"order": self.order.id, "status": "Оплачен", "payment_type": "card"}
+
+    def test_token_bucket_rejects_burst(self):
+        """Тестирование отказа с кодом 429 после исчерпания токенов."""
+        with mock.patch.object(TokenBucketThrottle, 'THROTTLE_RATES', {'payments': '2/min'}):
+            for _ in range(2):
+                response = self.client.post(self.url, self.data, format='json')
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    def test_token_bucket_is_atomic_under_concurrency(self):
+        """Тестирование того, что конкурентные запросы не превышают емкость ведра."""
+        request = mock.Mock(user=AnonymousUser(), META={'REMOTE_ADDR': '10.0.0.1'})
+        view = mock.Mock(throttle_scope='payments')
+        barrier = threading.Barrier(20)
+        allowed = []
+
+        def hit():
+            throttle = TokenBucketThrottle()
+            barrier.wait()
+            allowed.append(throttle.allow_request(request, view))
+
+        def slow_get(*args, **kwargs):
+            # Расширяет окно гонки между чтением и записью ведра.
+            value = cache.get(*args, **kwargs)
+            time.sleep(0.005)
+            return value
+
+        slow_cache = mock.Mock(wraps=cache, get=slow_get)
+        rates = {'payments': '5/min'}
+        with mock.patch.object(TokenBucketThrottle, 'THROTTLE_RATES', rates), \
+                mock.patch.object(TokenBucketThrottle, 'cache', slow_cache):
+            threads = [threading.Thread(target=hit) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(allowed.count(True), 5)
+
+    def test_token_bucket_keeps_lock_taken_by_another_request(self):
+        """Тестирование того, что запрос не снимает блокировку ведра, перехваченную после истечения TTL."""
+        request = mock.Mock(user=AnonymousUser(), META={'REMOTE_ADDR': '10.0.0.1'})
+        view = mock.Mock(throttle_scope='payments')
+        throttle = TokenBucketThrottle()
+
+        def take_token_after_lock_expired():
+            # Пока запрос работал, его блокировка истекла и ее взял другой запрос.
+            cache.set(f'{throttle.key}_lock', 'other-owner')
+            return True
+
+        with mock.patch.object(TokenBucketThrottle, 'THROTTLE_RATES', {'payments': '5/min'}), \
+                mock.patch.object(throttle, 'take_token', take_token_after_lock_expired):
+            self.assertTrue(throttle.allow_request(request, view))
+        self.assertEqual(cache.get(f'{throttle.key}_lock'), 'other-owner')
+
+    def test_token_bucket_is_per_endpoint(self):
+        """Тестирование независимости ведер разных эндпоинтов."""
+        rates = {'payments': '1/min', 'orders': '1/min'}
+        with mock.patch.object(TokenBucketThrottle, 'THROTTLE_RATES', rates):
+            response = self.client.post(self.url, self.data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            response = self.client.post(reverse('order-create'), {"items": []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_in_flight_cap_sheds_load(self):
+        """Тестирование отказа с кодом 429 при превышении лимита одновременных записей."""
+        limiter = ConcurrencyLimiter('test_in_flight', 1, 60)
+        # Слот занят другим процессом с тем же ключом.
+        self.assertIsNotNone(ConcurrencyLimiter('test_in_flight', 1, 60).acquire())
+        with mock.patch.object(OrderCreateAPIView, 'write_limiter', limiter):
+            response = self.client.post(reverse('order-create'), {"items": []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_in_flight_slot_is_released(self):
+        """Тестирование освобождения слота после завершения запроса."""
+        limiter = ConcurrencyLimiter('test_in_flight', 1, 60)
+        with mock.patch.object(OrderCreateAPIView, 'write_limiter', limiter):
+            for _ in range(2):
+                response = self.client.post(reverse('order-create'), {"items": []}, format='json')
+                self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(cache.get('test_in_flight_0'))
+
+    def test_expired_slots_do_not_release_newer_holders(self):
+        """Тестирование того, что освобождение истекших слотов не снимает лимит с новых запросов."""
+        limiter = ConcurrencyLimiter('test_in_flight', 2, 60)
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1000):
+            old_slots = [limiter.acquire(), limiter.acquire()]
+            self.assertIsNone(limiter.acquire())
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1061):
+            # Слоты старых запросов истекли, как после падения процесса.
+            new_slots = [limiter.acquire(), limiter.acquire()]
+            self.assertNotIn(None, new_slots)
+            self.assertIsNone(limiter.acquire())
+            for slot in old_slots:
+                limiter.release(slot)
+            self.assertIsNone(limiter.acquire())
+            limiter.release(new_slots[0])
+            self.assertIsNotNone(limiter.acquire())
+
+
+class WebhookDispatcherTests(TestCase):
+
+    def setUp(self):
+        # Убираем получателя, созданного миграцией.
+        WebhookEndpoint.objects.all().delete()
+        self.endpoint = WebhookEndpoint.objects.create(
+            url='https://example.com/hook',
+            secret='secret',
+            batch_size=2,
+            batch_interval_ms=60000,
+            use_gzip=True,
+        )
+        self.dispatcher = WebhookDispatcher()
+        self.session = mock.Mock()
+        self.session.post.return_value.status_code = 200
+        self.dispatcher._local.session = self.session
+
+    def test_send_only_queues_events(self):
+        """Тестирование сохранения событий в очередь без обращения к получателю."""
+        WebhookEndpoint.objects.create(url='https://example.com/off', is_active=False)
+        self.dispatcher.send({"id": 1})
+        self.session.post.assert_not_called()
+        self.assertEqual(list(PendingWebhookEvent.objects.values_list('endpoint_id', 'event')),
+                         [(self.endpoint.id, {"id": 1})])
+
+    def test_batch_is_sent_when_full(self):
+        """Тестирование отправки пакета после набора batch_size событий."""
+        self.dispatcher.send({"id": 1})
+        self.assertEqual(self.dispatcher.process(), 0)
+        self.session.post.assert_not_called()
+        self.dispatcher.send({"id": 2})
+        self.assertEqual(self.dispatcher.process(), 2)
+        self.session.post.assert_called_once()
+
+        kwargs = self.session.post.call_args.kwargs
+        body = kwargs['data']
+        self.assertEqual(kwargs['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(kwargs['headers'][SIGNATURE_HEADER], sign('secret', body))
+        self.assertEqual(json.loads(gzip.decompress(body)), {"events": [{"id": 1}, {"id": 2}]})
+
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.events_count, 2)
+        self.assertEqual(delivery.status_code, 200)
+        self.assertFalse(PendingWebhookEvent.objects.exists())
+
+    def test_partial_batch_is_sent_after_interval(self):
+        """Тестирование отправки неполного пакета в конверте после batch_interval_ms."""
+        self.dispatcher.send({"id": 1})
+        PendingWebhookEvent.objects.update(created_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(self.dispatcher.process(), 1)
+        body = self.session.post.call_args.kwargs['data']
+        self.assertEqual(json.loads(gzip.decompress(body)), {"events": [{"id": 1}]})
+
+    def test_send_webhooks_command_flushes_queue(self):
+        """Тестирование отправки неполного пакета командой send_webhooks --once --flush."""
+        self.dispatcher.send({"id": 1})
+        with mock.patch('app.management.commands.send_webhooks.dispatcher', self.dispatcher):
+            call_command('send_webhooks', once=True, flush=True, stdout=StringIO())
+        self.session.post.assert_called_once()
+        self.assertFalse(PendingWebhookEvent.objects.exists())
+
+    def test_legacy_payload_sends_bare_events(self):
+        """Тестирование отправки событий по одному без конверта для старого формата."""
+        self.endpoint.use_gzip = False
+        self.endpoint.legacy_payload = True
+        self.endpoint.save()
+        self.dispatcher.send({"id": 1})
+        self.dispatcher.send({"id": 2})
+        self.dispatcher.process()
+        bodies = [json.loads(call.kwargs['data']) for call in self.session.post.call_args_list]
+        self.assertEqual(bodies, [{"id": 1}, {"id": 2}])
+
+    def test_queued_events_use_current_endpoint_settings(self):
+        """Тестирование отправки событий из очереди по текущим настройкам получателя."""
+        self.dispatcher.send({"id": 1})
+        WebhookEndpoint.objects.filter(pk=self.endpoint.pk).update(url='https://example.com/new', secret='new')
+        self.dispatcher.process(flush=True)
+        kwargs = self.session.post.call_args.kwargs
+        self.assertEqual(self.session.post.call_args.args[0], 'https://example.com/new')
+        self.assertEqual(kwargs['headers'][SIGNATURE_HEADER], sign('new', kwargs['data']))
+
+    def test_deactivated_endpoint_keeps_events(self):
+        """Тестирование сохранения событий для отключенного получателя."""
+        self.dispatcher.send({"id": 1})
+        WebhookEndpoint.objects.filter(pk=self.endpoint.pk).update(is_active=False)
+        self.dispatcher.process()
+        self.session.post.assert_not_called()
+        delivery = WebhookDelivery.objects.get()
+        self.assertTrue(delivery.gave_up)
+        self.assertEqual(delivery.events, [{"id": 1}])
+        self.assertFalse(PendingWebhookEvent.objects.exists())
+
+    @mock.patch('app.webhooks.time.sleep')
+    def test_failed_attempts_back_off_and_can_be_redelivered(self, sleep):
+        """Тестирование паузы между попытками, сохранения недоставленных событий и повторной отправки."""
+        self.endpoint.batch_size = 1
+        self.endpoint.max_attempts = 3
+        self.endpoint.save()
+        self.session.post.return_value.status_code = 503
+        self.dispatcher.send({"id": 1})
+        self.dispatcher.process()
+
+        self.assertEqual(self.session.post.call_count, 3)
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [1, 2])
+        deliveries = list(WebhookDelivery.objects.order_by('attempt'))
+        self.assertEqual([delivery.attempt for delivery in deliveries], [1, 2, 3])
+        self.assertEqual([delivery.gave_up for delivery in deliveries], [False, False, True])
+        self.assertEqual(deliveries[-1].events, [{"id": 1}])
+
+        self.dispatcher.redeliver(deliveries[-1])
+        deliveries[-1].refresh_from_db()
+        self.assertFalse(deliveries[-1].gave_up)
+        self.assertEqual(list(PendingWebhookEvent.objects.values_list('event', flat=True)), [{"id": 1}])
+
+        self.session.post.return_value.status_code = 200
+        self.dispatcher.process()
+        self.assertTrue(WebhookDelivery.objects.latest('id').is_success)
+
+
+class ArchiveOrdersCommandTests(TestCase):
+
+    def setUp(self):
+        self.product = Product.objects.create(name='Test Product', content='Test Content', cost='10.00')
+        old = timezone.now() - timedelta(days=400)
+        self.old_closed = Order.objects.create(status='confirmed', creation_time=old)
+        OrderItem.objects.create(order=self.old_closed, product=self.product, quantity=3)
+        Payment.objects.create(order=self.old_closed, status='Оплачен')
+        self.old_open = Order.objects.create(status='created', creation_time=old)
+        self.recent_closed = Order.objects.create(status='completed')
+
+    def test_archive_to_table(self):
+        """Тестирование переноса старых закрытых заказов в архивную таблицу."""
+        call_command('archive_orders', days=365, stdout=StringIO())
+
+        self.assertQuerySetEqual(Order.objects.order_by('id'), [self.old_open, self.recent_closed])
+        self.assertFalse(OrderItem.objects.exists())
+        self.assertFalse(Payment.objects.exists())
+
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual(archived.id, self.old_closed.id)
+        self.assertEqual(archived.total_sum, Decimal('30.00'))
+        self.assertEqual(archived.items[0]['quantity'], 3)
+        self.assertEqual(archived.payments[0]['amount'], '30.00')
+
+    def test_archived_total_matches_archived_items(self):
+        """Тестирование согласованности суммы и позиций архивного заказа при устаревшем кеше продуктов."""
+        product_cache.get_many([self.product.id])
+        Product.objects.filter(pk=self.product.pk).update(cost='12.00')
+        call_command('archive_orders', days=365, stdout=StringIO())
+
+        archived = ArchivedOrder.objects.get()
+        self.assertEqual(archived.items[0]['cost'], '12.00')
+        self.assertEqual(archived.total_sum, Decimal('36.00'))
+
+    def test_get_or_archived_falls_back_to_archive(self):
+        """Тестирование поиска заказа по id в рабочей и архивной таблицах."""
+        call_command('archive_orders', days=365, stdout=StringIO())
+
+        self.assertEqual(Order.objects.get_or_archived(self.recent_closed.id), self.recent_closed)
+        archived = Order.objects.get_or_archived(self.old_closed.id)
+        self.assertIsInstance(archived, ArchivedOrder)
+        self.assertEqual(archived.total_sum, Decimal('30.00'))
+        with self.assertRaises(Order.DoesNotExist):
+            Order.objects.get_or_archived(self.recent_closed.id + 100)
+
+    def test_archive_to_csv(self):
+        """Тестирование выгрузки старых закрытых заказов в CSV-файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'orders.csv')
+            call_command('archive_orders', days=365, csv_path=path, stdout=StringIO())
+            with open(path, newline='') as csv_file:
+                rows = list(csv.DictReader(csv_file))
+
+        self.assertEqual([int(row['id']) for row in rows], [self.old_closed.id])
+        self.assertEqual(json.loads(rows[0]['items'])[0]['product_name'], 'Test Product')
+        self.assertFalse(ArchivedOrder.objects.exists())
+        self.assertFalse(Order.objects.filter(id=self.old_closed.id).exists())
+
+
+    def test_csv_rerun_after_failed_delete_does_not_duplicate(self):
+        """Тестирование отсутствия дублей в CSV после сбоя удаления и повторного запуска."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'orders.csv')
+            with mock.patch.object(QuerySet, 'delete', side_effect=DatabaseError):
+                with self.assertRaises(DatabaseError):
+                    call_command('archive_orders', days=365, csv_path=path, stdout=StringIO())
+            self.assertTrue(Order.objects.filter(id=self.old_closed.id).exists())
+
+            call_command('archive_orders', days=365, csv_path=path, stdout=StringIO())
+            with open(path, newline='') as csv_file:
+                rows = list(csv.DictReader(csv_file))
+
+        self.assertEqual([int(row['id']) for row in rows], [self.old_closed.id])
+        self.assertFalse(Order.objects.filter(id=self.old_closed.id).exists())
+
+
 class AdminTest(TestCase):
     def setUp(self):
         # Создаем пользователя администратора
@@ -136,7 +542,11 @@ class AdminTest(TestCase):
 
         # URL для действия подтверждения заказа
         confirm_url = reverse('admin:order-confirm', args=[self.order.pk])
-        response = self.client.get(confirm_url)
+        with mock.patch('app.admin.time.sleep'), mock.patch('app.webhooks.requests.Session') as session:
+            response = self.client.get(confirm_url)
+        # Вебхук только поставлен в очередь, запросов к получателю нет
+        session.assert_not_called()
+        self.assertEqual(PendingWebhookEvent.objects.get().event['id'], self.order.id)
         # Перенаправление обратно на список заказов после подтверждения
         self.assertRedirects(response, reverse('admin:app_order_changelist'))
 
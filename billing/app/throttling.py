@@ -0,0 +1,163 @@
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import Throttled
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+
+def delete_if_owner(key, token):
+    """
+    Удаляет ключ кеша, только если в нем все еще лежит токен владельца.
+    Не дает удалить ключ, который после истечения TTL уже занял кто-то другой.
+    Проверка и удаление — две операции кеша, но окно между ними намного
+    короче TTL ключа, после которого ключ может сменить владельца.
+    """
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Троттлинг по алгоритму token bucket для каждого клиента и каждого эндпоинта.
+
+    Скорость задается через `throttle_scope` представления и DEFAULT_THROTTLE_RATES
+    (например, '60/min'): емкость ведра равна числу запросов, а токены пополняются
+    равномерно в течение периода. Состояние ведра хранится в кеше Django,
+    поэтому разделяется между процессами при общем бэкенде кеша. Чтение и
+    запись ведра выполняются под блокировкой, взятой через cache.add, так что
+    конкурентные запросы не могут потратить один и тот же токен.
+    """
+    scope_attr = 'throttle_scope'
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+    # Время жизни блокировки защищает от зависшего ключа, если процесс упал во время обновления.
+    lock_timeout = 5
+    # Сколько ждать блокировку, прежде чем отклонить запрос.
+    lock_wait = 0.5
+
+    def __init__(self):
+        # Скорость определяется только после получения представления в allow_request.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        lock_key = f'{self.key}_lock'
+        lock_token = self.acquire_lock(lock_key)
+        if lock_token is None:
+            self.wait_time = self.lock_wait
+            return False
+        try:
+            return self.take_token()
+        finally:
+            delete_if_owner(lock_key, lock_token)
+
+    def acquire_lock(self, lock_key):
+        """
+        Берет блокировку ведра. Возвращает токен владельца или None, если блокировка не получена.
+        """
+        token = uuid4().hex
+        deadline = time.monotonic() + self.lock_wait
+        while not self.cache.add(lock_key, token, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.001)
+        return token
+
+    def take_token(self):
+        """
+        Пополняет ведро за прошедшее время и забирает из него один токен.
+        Вызывается только под блокировкой ведра.
+        """
+        self.now = self.timer()
+        refill_rate = self.num_requests / self.duration
+        tokens, updated_at = self.cache.get(self.key, (self.num_requests, self.now))
+        tokens = min(self.num_requests, tokens + (self.now - updated_at) * refill_rate)
+
+        if tokens < 1:
+            self.wait_time = (1 - tokens) / refill_rate
+            self.cache.set(self.key, (tokens, self.now), self.duration)
+            return False
+
+        self.cache.set(self.key, (tokens - 1, self.now), self.duration)
+        return True
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def wait(self):
+        return self.wait_time
+
+
+class ConcurrencyLimiter:
+    """
+    Неблокирующий ограничитель числа одновременно выполняемых запросов.
+
+    Каждый из `limit` слотов — отдельный ключ кеша, который занимается через
+    cache.add и хранит токен владельца, поэтому при общем бэкенде кеша лимит
+    действует на все процессы сразу. Слот живет не дольше `ttl` секунд: если
+    процесс упал, не освободив слот, освобождается только этот слот, а слоты
+    остальных процессов не затрагиваются.
+    """
+
+    def __init__(self, key, limit, ttl):
+        self.key = key
+        self.limit = limit
+        self.ttl = ttl
+
+    def acquire(self):
+        """
+        Занимает свободный слот. Возвращает пару (ключ слота, токен) или None при исчерпании лимита.
+        """
+        token = uuid4().hex
+        for index in range(self.limit):
+            slot_key = f'{self.key}_{index}'
+            if cache.add(slot_key, token, self.ttl):
+                return slot_key, token
+        return None
+
+    def release(self, slot):
+        delete_if_owner(*slot)
+
+
+write_limiter = ConcurrencyLimiter('write_in_flight', settings.WRITE_MAX_IN_FLIGHT, settings.WRITE_IN_FLIGHT_TTL)
+
+
+class WriteConcurrencyLimitMixin:
+    """
+    Примесь для представлений, ограничивающая число одновременных запросов на запись.
+
+    При исчерпании лимита запрос сразу отклоняется с кодом 429 и заголовком
+    Retry-After вместо ожидания в очереди.
+    """
+    write_limiter = write_limiter
+
+    def dispatch(self, request, *args, **kwargs):
+        self._write_slot = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._write_slot is not None:
+                self.write_limiter.release(self._write_slot)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS:
+            return
+        self._write_slot = self.write_limiter.acquire()
+        if self._write_slot is None:
+            raise Throttled(wait=settings.WRITE_RETRY_AFTER)
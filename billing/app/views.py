@@ -1,6 +1,7 @@
 from rest_framework import generics
 from .models import Product, Order, Payment
 from .serializers import ProductSerializer, OrderSerializer, PaymentSerializer
+from .throttling import TokenBucketThrottle, WriteConcurrencyLimitMixin
 
 
 class ProductListAPIView(generics.ListAPIView):
@@ -12,22 +13,26 @@ class ProductListAPIView(generics.ListAPIView):
     serializer_class = ProductSerializer
 
 
-class OrderCreateAPIView(generics.CreateAPIView):
+class OrderCreateAPIView(WriteConcurrencyLimitMixin, generics.CreateAPIView):
     """
     Представление для создания нового заказа.
     Позволяет пользователям создавать заказы, указывая список продуктов и их количество.
     """
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'orders'
 
 
-class PaymentCreateAPIView(generics.CreateAPIView):
+class PaymentCreateAPIView(WriteConcurrencyLimitMixin, generics.CreateAPIView):
     """
     Представление для создания нового платежа по заказу.
     При создании платежа автоматически устанавливает сумму платежа, равную итоговой сумме заказа.
     """
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'payments'
 
     def perform_create(self, serializer):
         """
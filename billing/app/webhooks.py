@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import hmac
+import json
+import threading
+import time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from .models import WebhookEndpoint, WebhookDelivery, PendingWebhookEvent
+
+SIGNATURE_HEADER = 'X-Webhook-Signature'
+
+
+def sign(secret, body):
+    """
+    Возвращает HMAC-SHA256 подпись тела запроса в виде 'sha256=<hex>'.
+    """
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f'sha256={digest}'
+
+
+class WebhookDispatcher:
+    """
+    Ставит события в очередь и отправляет их получателям пакетами.
+
+    send() только сохраняет события в таблицу PendingWebhookEvent, поэтому
+    подтверждение заказа не ждет получателя, а события переживают падение
+    процесса. Отправкой занимается команда send_webhooks: пакет уходит, когда
+    в очереди получателя набирается `batch_size` событий или самое старое из
+    них ждет дольше `batch_interval_ms`. Пакеты собираются из общей таблицы,
+    поэтому объединяют события всех процессов. Строки удаляются в той же
+    транзакции, в которой записан результат отправки, так что доставка
+    выполняется как минимум один раз.
+
+    Тело запроса всегда имеет вид {"events": [...]}, кроме получателей
+    с флагом `legacy_payload`, которым каждое событие уходит отдельно.
+    """
+
+    def __init__(self):
+        # requests.Session не гарантирует потокобезопасность, поэтому у каждого потока своя сессия.
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def send(self, event):
+        """
+        Ставит событие в очередь для всех активных получателей.
+        """
+        PendingWebhookEvent.objects.bulk_create(
+            PendingWebhookEvent(endpoint=endpoint, event=event)
+            for endpoint in WebhookEndpoint.objects.filter(is_active=True)
+        )
+
+    def process(self, flush=False):
+        """
+        Отправляет готовые пакеты всех получателей и возвращает число обработанных событий.
+        При flush=True неполные пакеты отправляются, не дожидаясь batch_interval_ms.
+        """
+        processed = 0
+        endpoint_ids = PendingWebhookEvent.objects.values_list('endpoint_id', flat=True).distinct()
+        for endpoint_id in list(endpoint_ids):
+            while True:
+                count = self._process_batch(endpoint_id, flush)
+                if not count:
+                    break
+                processed += count
+        return processed
+
+    def deliver(self, endpoint, events):
+        """
+        Отправляет пакет событий получателю и записывает каждую попытку в журнал доставки.
+
+        Если получатель отключен или все попытки исчерпаны, события сохраняются
+        в журнале доставки с флагом `gave_up` для повторной отправки.
+        """
+        if not endpoint.is_active:
+            return WebhookDelivery.objects.create(
+                endpoint=endpoint,
+                attempt=0,
+                events_count=len(events),
+                latency_ms=0,
+                error='Получатель отключен',
+                gave_up=True,
+                events=events,
+            )
+        if endpoint.legacy_payload:
+            return [self._post(endpoint, [event], event) for event in events][-1]
+        return self._post(endpoint, events, {'events': events})
+
+    def redeliver(self, delivery):
+        """
+        Возвращает в очередь события из записи журнала, по которой доставка была прекращена.
+        """
+        with transaction.atomic():
+            PendingWebhookEvent.objects.bulk_create(
+                PendingWebhookEvent(endpoint_id=delivery.endpoint_id, event=event) for event in delivery.events
+            )
+            delivery.gave_up = False
+            delivery.events = None
+            delivery.save(update_fields=['gave_up', 'events'])
+
+    def _process_batch(self, endpoint_id, flush):
+        with transaction.atomic():
+            endpoint = WebhookEndpoint.objects.filter(pk=endpoint_id).first()
+            if endpoint is None:
+                return 0
+            pending = list(
+                PendingWebhookEvent.objects.select_for_update(skip_locked=True)
+                .filter(endpoint=endpoint).order_by('id')[:endpoint.batch_size]
+            )
+            if not pending:
+                return 0
+            deadline = timezone.now() - timedelta(milliseconds=endpoint.batch_interval_ms)
+            if endpoint.is_active and len(pending) < endpoint.batch_size and not flush \
+                    and pending[0].created_at > deadline:
+                return 0
+            self.deliver(endpoint, [item.event for item in pending])
+            PendingWebhookEvent.objects.filter(id__in=[item.id for item in pending]).delete()
+        return len(pending)
+
+    def _post(self, endpoint, events, payload):
+        body = json.dumps(payload, cls=DjangoJSONEncoder).encode()
+        headers = {'Content-Type': 'application/json'}
+        if endpoint.use_gzip:
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        if endpoint.secret:
+            headers[SIGNATURE_HEADER] = sign(endpoint.secret, body)
+
+        delivery = None
+        for attempt in range(1, max(endpoint.max_attempts, 1) + 1):
+            if attempt > 1:
+                time.sleep(settings.WEBHOOK_RETRY_BACKOFF * 2 ** (attempt - 2))
+            status_code, error = None, ''
+            started = time.perf_counter()
+            try:
+                response = self.session.post(endpoint.url, data=body, headers=headers,
+                                             timeout=settings.WEBHOOK_TIMEOUT)
+                status_code = response.status_code
+            except requests.RequestException as exc:
+                error = str(exc)
+            delivery = WebhookDelivery.objects.create(
+                endpoint=endpoint,
+                attempt=attempt,
+                events_count=len(events),
+                status_code=status_code,
+                latency_ms=(time.perf_counter() - started) * 1000,
+                error=error,
+            )
+            if delivery.is_success:
+                return delivery
+
+        delivery.gave_up = True
+        delivery.events = events
+        delivery.save(update_fields=['gave_up', 'events'])
+        return delivery
+
+
+dispatcher = WebhookDispatcher()
@@ -84,6 +84,64 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Throttle state, the write in-flight slots and the product cache version key
+# live here. Point it at a shared backend (e.g. Redis) in production: with
+# LocMemCache each process has its own copy and limits/invalidation are per process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+# Django REST framework
+
+REST_FRAMEWORK = {
+    'DEFAULT_THROTTLE_RATES': {
+        'orders': '60/min',
+        'payments': '60/min',
+    },
+}
+
+# Maximum number of concurrent write requests before shedding with 429.
+# Slots live in the default cache, so the cap spans all processes only
+# with a shared cache backend; with LocMemCache it is per process.
+WRITE_MAX_IN_FLIGHT = 16
+
+# Lifetime (seconds) of a single in-flight slot, so a slot leaked by a crashed
+# worker is reclaimed. Keep it above the slowest expected write request.
+WRITE_IN_FLIGHT_TTL = 60
+
+# Retry-After value (seconds) sent when the write concurrency cap is reached.
+WRITE_RETRY_AFTER = 1
+
+# Seconds the generated OpenAPI document is cached; 0 disables caching.
+# Disabled under DEBUG so schema changes show up immediately during development.
+SWAGGER_CACHE_TIMEOUT = 0 if DEBUG else 60 * 60
+
+# Maximum number of products kept in the per-process product cache.
+PRODUCT_CACHE_SIZE = 10000
+
+# Seconds a cached product cost/name is trusted. Bounds staleness when another
+# process changes a product and the cache backend is not shared.
+PRODUCT_CACHE_TTL = 30
+
+# Closed orders older than this many days are moved out by `archive_orders`.
+ORDER_RETENTION_DAYS = 365
+
+# Seconds between queue polls in the `send_webhooks` worker.
+WEBHOOK_POLL_INTERVAL = 0.5
+
+# Timeout (seconds) for a single webhook delivery attempt.
+WEBHOOK_TIMEOUT = 5
+
+# Delay (seconds) before the first webhook retry; doubled for each next attempt.
+WEBHOOK_RETRY_BACKOFF = 1
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -0,0 +1,33 @@
+"""
+Lean settings profile for API-only pods.
+
+Drops the admin, sessions, messages and Swagger UI together with their
+middleware, and serves JSON only. Select it with
+DJANGO_SETTINGS_MODULE=billing.settings_api.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+        'drf_yasg',
+    )
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
@@ -0,0 +1,17 @@
+"""
+Lean settings profile for short-lived workers and management commands.
+
+Keeps only the apps needed to work with the billing models. Select it with
+DJANGO_SETTINGS_MODULE=billing.settings_worker.
+"""
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'app',
+]
+
+MIDDLEWARE = []
+
+TEMPLATES = []
@@ -14,23 +14,45 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from functools import cache
+
+from django.apps import apps
+from django.conf import settings
 from django.urls import path, include, re_path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="API Documentation",
-      default_version='v1',
-      description="",
-      terms_of_service="",
-   ),
-   public=True,
-)
+
+
+@cache
+def get_swagger_ui_view():
+    """
+    Строит представление Swagger UI при первом обращении, а не при импорте URLconf.
+    """
+    from drf_yasg import openapi
+    from drf_yasg.views import get_schema_view
+
+    schema_view = get_schema_view(
+       openapi.Info(
+          title="API Documentation",
+          default_version='v1',
+          description="",
+          terms_of_service="",
+       ),
+       public=True,
+    )
+    return schema_view.with_ui('swagger', cache_timeout=settings.SWAGGER_CACHE_TIMEOUT)
+
+
+def swagger_ui(request, *args, **kwargs):
+    return get_swagger_ui_view()(request, *args, **kwargs)
+
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
-    re_path(r'^swagger/$', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('', include('app.urls'))
 ]
+
+if apps.is_installed('drf_yasg'):
+    urlpatterns.insert(0, re_path(r'^swagger/$', swagger_ui, name='schema-swagger-ui'))
+
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))